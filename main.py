@@ -1,13 +1,27 @@
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dataclasses import dataclass
+from functools import partial
+from itertools import chain
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 import structlog
 
-@dataclass
+# orjson encodes and decodes considerably faster than the standard library, but is optional
+try:
+    import orjson
+    from orjson import loads as json_loads
+
+    def json_dumps(obj, **kwargs):
+        # non-str keys are stringified as the standard library does, rather than raising, so a log call cannot fail
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS, **kwargs).decode()
+except ImportError:
+    from json import loads as json_loads, dumps as json_dumps
+
+@dataclass(frozen=True)
 class S3CleanConfig:
     """S3 Clean Invocation Config"""
     asset_bucket_id: str
@@ -22,76 +36,103 @@ class S3CleanConfig:
     tidy_enabled: bool
 
 class WithLogging:
+    loggers = {}
+
     def logger(class_name):
-        log = structlog.get_logger()
-        log.bind(**{'class': class_name})
-        log.bind(pennsieve={'service_name': class_name})
+        # the context is passed as initial values (bind() returns a new logger, which was being discarded);
+        # the logger stays lazy, as these are created before structlog is configured
+        log = WithLogging.loggers.get(class_name)
+        if log is None:
+            log = structlog.get_logger(**{'class': class_name}, pennsieve={'service_name': class_name})
+            WithLogging.loggers[class_name] = log
         return log
 
 class RequestPayer:
     def __init__(self, is_requestor_pays = True):
         self.is_requestor_pays = is_requestor_pays
+        # callers only unpack the arguments, so one dict is built and shared by every call
+        self.kwargs = {'RequestPayer': 'requester'} if is_requestor_pays else {}
 
     def __call__(self):
-        return {'RequestPayer': 'requester'} if self.is_requestor_pays else {}
+        return self.kwargs
 
 class S3Paginator:
     log = WithLogging.logger('S3Paginator')
-    s3 = boto3.client("s3")
-    paginator = None
-    requestor_pays = None
-
-    def init(paginator, is_requestor_pays = True):
-        S3Paginator.log.info(f"init() is_requestor_pays: {is_requestor_pays}")
-        S3Paginator.requestor_pays = RequestPayer(is_requestor_pays)
-        S3Paginator.paginator = paginator
 
-    def paginate(Bucket, Prefix, PaginationConfig={'PageSize': 1000}, **kwargs):
-        S3Paginator.log.info(f"paginate() Bucket: {Bucket} Prefix: {Prefix} PaginationConfig: {PaginationConfig}")
-        return S3Paginator.paginator.paginate(Bucket=Bucket,
-                                              Prefix=Prefix,
-                                              PaginationConfig=PaginationConfig,
-                                              **S3Paginator.requestor_pays())
+    def __init__(self, paginator, is_requestor_pays = True):
+        S3Paginator.log.info(f"__init__() is_requestor_pays: {is_requestor_pays}")
+        self.requestor_pays = RequestPayer(is_requestor_pays)
+        self.paginator = paginator
+
+    def paginate(self, Bucket, Prefix, PaginationConfig={'PageSize': 1000}, **kwargs):
+        # a Delimiter would only list one folder level, and it is not forwarded, so reject it rather than silently drop it
+        if 'Delimiter' in kwargs or 'Delimiter' in PaginationConfig:
+            raise ValueError("paginate() does not support a Delimiter")
+        S3Paginator.log.info("paginate()", Bucket=Bucket, Prefix=Prefix, PaginationConfig=PaginationConfig)
+        return self.paginator.paginate(Bucket=Bucket,
+                                       Prefix=Prefix,
+                                       PaginationConfig=PaginationConfig,
+                                       **self.requestor_pays())
 
 class S3Client:
     log = WithLogging.logger('S3Client')
     s3 = None
     is_requestor_pays = True
     requestor_pays = None
+    paginators = {}
 
-    def init(endpoint_url = None, is_requestor_pays = True):
-        S3Client.log.info(f"init() is_requestor_pays: {is_requestor_pays}")
+    def init(endpoint_url = None, is_requestor_pays = True, max_pool_connections = 50):
+        S3Client.log.info(f"init() is_requestor_pays: {is_requestor_pays} max_pool_connections: {max_pool_connections}")
         S3Client.is_requestor_pays = is_requestor_pays
         S3Client.requestor_pays = RequestPayer(is_requestor_pays)
-        S3Client.s3 = boto3.client("s3", endpoint_url=endpoint_url)
+        # the pool covers the concurrent bulk deletes, and adaptive retries back off on SlowDown throttling
+        config = Config(max_pool_connections=max_pool_connections,
+                        retries={'mode': 'adaptive', 'max_attempts': 10},
+                        tcp_keepalive=True,
+                        connect_timeout=3,
+                        read_timeout=30,
+                        s3={'addressing_style': 'virtual' if endpoint_url is None else 'path'})
+        S3Client.s3 = boto3.client("s3", endpoint_url=endpoint_url, config=config)
+        S3Client.paginators = {}
 
     def get_paginator(operation_name):
-        S3Client.log.info(f"get_paginator() operation_name: {operation_name}")
-        S3Paginator.init(S3Client.s3.get_paginator(operation_name),
-                         S3Client.is_requestor_pays)
-        return S3Paginator
+        # botocore paginators hold no iteration state (each paginate() call builds its own page iterator),
+        # so one per operation is shared by every caller and thread
+        paginator = S3Client.paginators.get(operation_name)
+        if paginator is None:
+            S3Client.log.info(f"get_paginator() operation_name: {operation_name}")
+            paginator = S3Paginator(S3Client.s3.get_paginator(operation_name),
+                                    S3Client.is_requestor_pays)
+            S3Client.paginators[operation_name] = paginator
+        return paginator
 
     def list_object_versions(Bucket, Prefix):
-        S3Client.log.info(f"list_object_versions() Bucket: {Bucket} Prefix: {Prefix}")
+        S3Client.log.info("list_object_versions()", Bucket=Bucket, Prefix=Prefix)
         return S3Client.s3.list_object_versions(Bucket=Bucket,
                                                 Prefix=Prefix,
                                                 **S3Client.requestor_pays())
 
     def put_object(Body, Bucket, Key):
-        S3Client.log.info(f"put_object() Bucket: {Bucket} Key: {Key}")
+        S3Client.log.info("put_object()", Bucket=Bucket, Key=Key)
         return S3Client.s3.put_object(Body=Body,
                                       Bucket=Bucket,
                                       Key=Key,
                                       **S3Client.requestor_pays())
 
     def get_object(Bucket, Key):
-        S3Client.log.info(f"get_object() Bucket: {Bucket} Key: {Key}")
+        S3Client.log.info("get_object()", Bucket=Bucket, Key=Key)
         return S3Client.s3.get_object(Bucket=Bucket,
                                       Key=Key,
                                       **S3Client.requestor_pays())
 
+    def head_object(Bucket, Key):
+        S3Client.log.info("head_object()", Bucket=Bucket, Key=Key)
+        return S3Client.s3.head_object(Bucket=Bucket,
+                                       Key=Key,
+                                       **S3Client.requestor_pays())
+
     def delete_object(Bucket, Key, VersionId=None):
-        S3Client.log.info(f"delete_object() Bucket: {Bucket} Key: {Key} VersionId: {VersionId}")
+        S3Client.log.info("delete_object()", Bucket=Bucket, Key=Key, VersionId=VersionId)
         if VersionId is not None:
             return S3Client.s3.delete_object(Bucket=Bucket,
                                              Key=Key,
@@ -102,9 +143,20 @@ class S3Client:
                                              Key=Key,
                                              **S3Client.requestor_pays())
 
+    def list_objects_v2(Bucket, Prefix, Delimiter, **kwargs):
+        S3Client.log.info("list_objects_v2()", Bucket=Bucket, Prefix=Prefix, Delimiter=Delimiter)
+        return S3Client.s3.list_objects_v2(Bucket=Bucket,
+                                           Prefix=Prefix,
+                                           Delimiter=Delimiter,
+                                           **S3Client.requestor_pays())
+
     def delete_objects(Bucket, Delete, **kwargs):
-        S3Client.log.info(f"delete_objects() Bucket: {Bucket} number-of-items: {len(Delete)}")
-        return S3Client.s3.delete_objects(Bucket=Bucket, Delete=Delete, **S3Client.requestor_pays())
+        S3Client.log.info("delete_objects()", Bucket=Bucket, number_of_items=len(Delete.get('Objects', ())))
+        response = S3Client.s3.delete_objects(Bucket=Bucket, Delete=Delete, **S3Client.requestor_pays())
+        # in Quiet mode the response only lists the keys that could not be deleted
+        for error in response.get('Errors', ()):
+            S3Client.log.error(f"delete_objects() Bucket: {Bucket} Key: {error.get('Key')} VersionId: {error.get('VersionId')} Code: {error.get('Code')} Message: {error.get('Message')}")
+        return response
 
 # Configure JSON logs in a format that ELK can understand
 # --------------------------------------------------
@@ -123,13 +175,28 @@ def add_log_level(logger, name, event_dict):
     return event_dict
 
 
+LOG_LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'warn': 30, 'error': 40, 'exception': 40, 'critical': 50}
+LOG_LEVEL = LOG_LEVELS.get(os.environ.get('LOG_LEVEL', 'INFO').lower(), LOG_LEVELS['info'])
+
+
+def drop_below_log_level(logger, name, event_dict):
+    """
+    Drop events below the configured `LOG_LEVEL` before any other processing.
+    """
+    if LOG_LEVELS.get(name, LOG_LEVEL) < LOG_LEVEL:
+        raise structlog.DropEvent
+    return event_dict
+
+
 structlog.configure(
     processors=[
+        drop_below_log_level,
         rewrite_event_to_message,
         add_log_level,
         structlog.processors.format_exc_info,
         structlog.processors.TimeStamper(fmt='iso'),
-        structlog.processors.JSONRenderer()])
+        structlog.processors.JSONRenderer(serializer=json_dumps)],
+    cache_logger_on_first_use=True)
 
 # Main lambda handler
 # --------------------------------------------------
@@ -139,13 +206,22 @@ SERVICE_NAME = os.environ['SERVICE_NAME']
 TIER = os.environ['TIER']
 FULL_SERVICE_NAME = f'{SERVICE_NAME}-{TIER}'
 
+# read once per container, so a misconfigured function fails at cold start rather than per request
+ASSET_BUCKET = os.environ['ASSET_BUCKET']
+DATASET_ASSETS_KEY_PREFIX = os.environ['DATASET_ASSETS_KEY_PREFIX']
+TIDY_ENABLED = os.environ.get("TIDY_ENABLED","TRUE")
+
+# Basic Pennsieve log context, bound once per container rather than per invocation
+BASE_LOG = structlog.get_logger().bind(**{'class': f'{__name__}.lambda_handler'},
+                                       pennsieve={'service_name': FULL_SERVICE_NAME})
+
 if ENVIRONMENT == 'local':
     S3_URL = 'http://localstack:4566'
 else:
     S3_URL = None
 
-S3Client.init(endpoint_url=S3_URL, is_requestor_pays=True)
-S3ClientPaginator = S3Client.get_paginator('list_objects_v2')
+# number of concurrent DeleteObjects calls
+S3_DELETE_CONCURRENCY = int(os.environ.get('S3_DELETE_CONCURRENCY', '32'))
 
 S3DeleteMarkersTag = "DeleteMarkers"
 S3VersionsTag = "Versions"
@@ -173,7 +249,7 @@ FileActionTag = "action"
 FileActionBucketTag = "bucket"
 FileActionPathTag = "path"
 FileActionVersionTag = "versionId"
-FileActionRequiredFields = [FileActionTag, FileActionBucketTag, FileActionPathTag]
+FileActionRequiredFields = frozenset([FileActionTag, FileActionBucketTag, FileActionPathTag])
 
 FileActionListTag = "fileActionList"
 
@@ -184,15 +260,30 @@ FileActionUnknown = "Unknown"
 
 Default_TidyEnabled = True
 
-NoValue = "(none)"
+DeleteObjectsMaxKeys = 1000
+DeleteMaxWorkers = S3_DELETE_CONCURRENCY
+DeleteMaxInFlight = 16
+DeleteMaxFanout = 16
+DeleteMaxFanoutDepth = 3
+# a purge cleans up to three buckets at once, each one fanning out over up to DeleteMaxFanout listings
+PurgeMaxBuckets = 3
+
+# DeleteObjects calls never wait on other tasks, so one pool is shared by every delete() for the life of the container
+DeleteExecutor = ThreadPoolExecutor(max_workers=DeleteMaxWorkers)
 
-PublishingIntermediateFiles = [FileActionKey,
+# one connection for every DeleteExecutor worker and every listing a purge runs alongside them
+S3Client.init(endpoint_url=S3_URL, is_requestor_pays=True, max_pool_connections=DeleteMaxWorkers + PurgeMaxBuckets * DeleteMaxFanout)
+S3ClientPaginator = S3Client.get_paginator('list_objects_v2')
+# built during the container's init phase; later get_paginator('list_object_versions') calls return this cached one
+S3ClientVersionsPaginator = S3Client.get_paginator('list_object_versions')
+
+PublishingIntermediateFiles = (FileActionKey,
                                GraphAssetsKey,
                                OutputAssetsKey,
                                DatasetAssetsKey,
                                RevisionsCleanupKey,
                                MetadataCleanupKey,
-                               ReleaseAssetsListing]
+                               ReleaseAssetsListing)
 
 def str_to_bool(s):
     if s is not None:
@@ -208,20 +299,17 @@ def is_tidy_enabled(tidy_enabled_evt, tidy_enabled_env):
     else:
         return Default_TidyEnabled
 
+# the client and paginator are created once per container and reused by every invocation;
+# they are handler parameters so that tests can inject their own
 def lambda_handler(event, context, s3_client=S3Client, s3_paginator=S3ClientPaginator):
-    # Create basic Pennsieve log context
-    log = structlog.get_logger()
-    log = log.bind(**{'class': f'{lambda_handler.__module__}.{lambda_handler.__name__}'})
-    log = log.bind(pennsieve={'service_name': FULL_SERVICE_NAME})
+    log = BASE_LOG
 
     try:
         log.info(f"boto3 version: {boto3.__version__}")
-        log.info('Reading environment')
-        asset_bucket_id = os.environ['ASSET_BUCKET']
-        assets_prefix = os.environ['DATASET_ASSETS_KEY_PREFIX']
-        tidy_enabled_env = os.environ.get("TIDY_ENABLED","TRUE")
-
         log.info('Parsing event')
+        asset_bucket_id = ASSET_BUCKET
+        assets_prefix = DATASET_ASSETS_KEY_PREFIX
+        tidy_enabled_env = TIDY_ENABLED
 
         publish_bucket_id = event['publish_bucket']
         embargo_bucket_id = event['embargo_bucket']
@@ -255,21 +343,19 @@ def purge_v4(log, asset_bucket_id, assets_prefix, publish_bucket_id, embargo_buc
         if s3_key_prefix_evt.endswith('/'):
             s3_key_prefix = s3_key_prefix_evt
         else:
-            s3_key_prefix = '{}/'.format(s3_key_prefix_evt)
+            s3_key_prefix = f'{s3_key_prefix_evt}/'
 
         assert s3_key_prefix.endswith('/')
         assert len(s3_key_prefix) > 1  # At least one character + slash
 
-        dataset_assets_prefix = '{}/{}'.format(assets_prefix, s3_key_prefix)
-
-        log.info('Deleting objects from bucket {} under key {}'.format(publish_bucket_id, s3_key_prefix))
-        delete(s3_client, s3_paginator, publish_bucket_id, s3_key_prefix, is_requester_pays=True)
-
-        log.info('Deleting objects from bucket {} under key {}'.format(embargo_bucket_id, s3_key_prefix))
-        delete(s3_client, s3_paginator, embargo_bucket_id, s3_key_prefix, is_requester_pays=True)
+        dataset_assets_prefix = f'{assets_prefix}/{s3_key_prefix}'
 
-        log.info('Deleting objects from bucket {} under key {}'.format(asset_bucket_id, dataset_assets_prefix))
-        delete(s3_client, s3_paginator, asset_bucket_id, dataset_assets_prefix)
+        log.info(f'Deleting objects from bucket {publish_bucket_id} under key {s3_key_prefix}')
+        log.info(f'Deleting objects from bucket {embargo_bucket_id} under key {s3_key_prefix}')
+        log.info(f'Deleting objects from bucket {asset_bucket_id} under key {dataset_assets_prefix}')
+        run_calls_in_parallel([(parallel_delete, (s3_client, s3_paginator, publish_bucket_id, s3_key_prefix, True)),
+                               (parallel_delete, (s3_client, s3_paginator, embargo_bucket_id, s3_key_prefix, True)),
+                               (parallel_delete, (s3_client, s3_paginator, asset_bucket_id, dataset_assets_prefix))])
 
     except Exception as e:
         log.error(e, exc_info=True)
@@ -279,33 +365,130 @@ def tidy_v4(log, tidy_enabled, s3_client, publish_bucket_id, embargo_bucket_id,
     log.info(f"tidy_v4() tidy_enabled: {tidy_enabled} publish_bucket_id: {publish_bucket_id} embargo_bucket_id: {embargo_bucket_id} s3_key_prefix: {s3_key_prefix}")
     if tidy_enabled:
         log.info(f"tidy_v4() removing intermediate publishing files")
-        for bucket_id in [publish_bucket_id, embargo_bucket_id]:
-            tidy_publication_directory(log, s3_client, bucket_id, s3_key_prefix)
+        run_in_parallel(tidy_publication_directory,
+                        [(log, s3_client, bucket_id, s3_key_prefix) for bucket_id in [publish_bucket_id, embargo_bucket_id]])
     else:
         log.info(f"tidy_v4() requested but disabled")
 
 def delete(s3_client, s3_paginator, bucket, prefix, is_requester_pays=False):
+    '''
+    Deletes every object under the prefix. The listing is made without a Delimiter so that all nested keys are
+    returned in one flat sweep of 1000-key pages, however deep the folder structure is.
+    :param s3_client: an S3 client
+    :param s3_paginator: a list_objects_v2 paginator
+    :param bucket: the name of the S3 bucket
+    :param prefix: the S3 key prefix to delete
+    :param is_requester_pays: whether to send RequestPayer on the requests
+    :return: (none)
+    '''
     requester_pays = {'RequestPayer': 'requester'} if is_requester_pays else {}
 
     pages = s3_paginator.paginate(Bucket=bucket, Prefix=prefix, PaginationConfig={
         'PageSize': 1000
     }, **requester_pays)
 
-    items_to_delete = dict(Objects=[])
+    # DeleteObjects calls run in the background so the next List page is fetched while they are in flight
+    in_flight = set()
+
+    # the bucket and requester-pays arguments are bound once rather than merged into every call
+    delete_objects = partial(s3_client.delete_objects, Bucket=bucket, **requester_pays)
 
+    # each page holds at most 1000 keys, the DeleteObjects limit, so a page is deleted in one call
     for page in pages:
-        has_contents = page.get('Contents', None)
-        if has_contents:
-            for item in page['Contents']:
-                items_to_delete['Objects'].append(dict(Key=item['Key']))
-                # flush once aws limit reached
-                if len(items_to_delete['Objects']) >= 1000:
-                    s3_client.delete_objects(Bucket=bucket, Delete=items_to_delete, **requester_pays)
-                    items_to_delete = dict(Objects=[])
-
-            # flush the rest
-            if len(items_to_delete['Objects']):
-                s3_client.delete_objects(Bucket=bucket, Delete=items_to_delete, **requester_pays)
+        contents = page.get('Contents')
+        if not contents:
+            continue
+        items_to_delete = {'Objects': [{'Key': item['Key']} for item in contents], 'Quiet': True}
+        submit_bounded(DeleteExecutor, in_flight, delete_objects, Delete=items_to_delete)
+
+    drain(in_flight)
+
+def parallel_delete(s3_client, s3_paginator, bucket, prefix, is_requester_pays=False, depth=DeleteMaxFanoutDepth):
+    '''
+    Deletes every object under the prefix, fanning out one delete() per top-level sub-folder so that the
+    listing and deletion of separate key ranges run concurrently. A prefix holding a single sub-folder is
+    descended into (up to depth levels) to find one to fan out over. Falls back to a single delete() when
+    the prefix holds no sub-folders, or too many to list in one call.
+    :param s3_client: an S3 client
+    :param s3_paginator: a list_objects_v2 paginator
+    :param bucket: the name of the S3 bucket
+    :param prefix: the S3 key prefix to delete
+    :param is_requester_pays: whether to send RequestPayer on the requests
+    :param depth: how many levels of single sub-folders to descend through
+    :return: (none)
+    '''
+    requester_pays = {'RequestPayer': 'requester'} if is_requester_pays else {}
+
+    listing = s3_client.list_objects_v2(Bucket=bucket, Prefix=prefix, Delimiter='/', **requester_pays)
+    sub_prefixes = [common_prefix['Prefix'] for common_prefix in listing.get('CommonPrefixes', ())]
+    if not sub_prefixes and not listing.get('Contents'):
+        # nothing under the prefix (the common case for a dataset that was never published), so no full listing is needed
+        return
+    if listing.get('IsTruncated') or len(sub_prefixes) == 0 or (len(sub_prefixes) == 1 and depth <= 1):
+        delete(s3_client, s3_paginator, bucket, prefix, is_requester_pays)
+        return
+
+    # the sub-folders and the keys directly under the prefix together cover every key under the prefix
+    contents = listing.get('Contents')
+    if contents:
+        s3_client.delete_objects(Bucket=bucket, Delete={'Objects': [{'Key': item['Key']} for item in contents], 'Quiet': True}, **requester_pays)
+
+    if len(sub_prefixes) == 1:
+        parallel_delete(s3_client, s3_paginator, bucket, sub_prefixes[0], is_requester_pays, depth - 1)
+        return
+
+    with ThreadPoolExecutor(max_workers=min(DeleteMaxFanout, len(sub_prefixes))) as executor:
+        in_flight = set()
+        for sub_prefix in sub_prefixes:
+            in_flight.add(executor.submit(delete, s3_client, s3_paginator, bucket, sub_prefix, is_requester_pays))
+        drain(in_flight)
+
+def submit_bounded(executor, in_flight, fn, **kwargs):
+    '''
+    Submits a call to the executor, first waiting for an in-flight call to finish if the in-flight limit is reached.
+    :param executor: a ThreadPoolExecutor
+    :param in_flight: the set of pending futures (updated in place)
+    :param fn: the function to call
+    :param kwargs: keyword arguments for the function
+    :return: (none)
+    '''
+    if len(in_flight) >= DeleteMaxInFlight:
+        done, pending = wait(in_flight, return_when=FIRST_COMPLETED)
+        in_flight.difference_update(done)
+        for future in done:
+            future.result()
+    in_flight.add(executor.submit(fn, **kwargs))
+
+def run_in_parallel(fn, args_list):
+    '''
+    Runs the same function once per argument tuple, see run_calls_in_parallel.
+    :param fn: the function to call
+    :param args_list: a list of argument tuples, one per call
+    :return: (none)
+    '''
+    run_calls_in_parallel([(fn, args) for args in args_list])
+
+def run_calls_in_parallel(calls):
+    '''
+    Runs calls on a pool of their own, one thread per call, and waits for all of them, re-raising the first error.
+    The orchestration steps of a stage (per bucket, per file or per folder) touch separate keys, so they are run this way rather than one
+    after another. These calls may wait on the DeleteExecutor themselves, so they must not run on it.
+    :param calls: a list of (function, argument tuple) pairs
+    :return: (none)
+    '''
+    with ThreadPoolExecutor(max_workers=max(1, len(calls))) as executor:
+        drain({executor.submit(fn, *args) for fn, args in calls})
+
+def drain(in_flight):
+    '''
+    Waits for all in-flight calls to finish, re-raising the first error.
+    :param in_flight: the set of pending futures
+    :return: (none)
+    '''
+    done, pending = wait(in_flight)
+    in_flight.clear()
+    for future in done:
+        future.result()
 
 def purge_v5(log, s3_client, s3_paginator, s3_clean_config):
     log.info(f"purge_v5() {s3_clean_config.cleanup_stage} config: {s3_clean_config}")
@@ -330,36 +513,35 @@ def purge_v5_initial(log, s3_client, s3_clean_config):
 def purge_v5_tidy(log, s3_client, s3_clean_config):
     if s3_clean_config.tidy_enabled:
         log.info(f"purge_v5_tidy() removing intermediate publishing files")
-        for bucket_id in [s3_clean_config.publish_bucket_id, s3_clean_config.embargo_bucket_id]:
-            tidy_publication_directory(log, s3_client, bucket_id, s3_clean_config.s3_key_prefix)
+        run_in_parallel(tidy_publication_directory,
+                        [(log, s3_client, bucket_id, s3_clean_config.s3_key_prefix)
+                         for bucket_id in [s3_clean_config.publish_bucket_id, s3_clean_config.embargo_bucket_id]])
     else:
         log.info(f"purge_v5_tidy() requested but disabled")
 
 def purge_v5_unpublish(log, s3_client, s3_paginator, s3_clean_config):
     log.info(f"purge_v5_unpublish() will remove all versions and all files")
 
-    for bucket_id in [s3_clean_config.publish_bucket_id, s3_clean_config.embargo_bucket_id]:
-        delete_all_versions(log, s3_client, bucket_id, s3_clean_config.dataset_id)
+    calls = [(delete_all_versions, (log, s3_client, bucket_id, s3_clean_config.dataset_id))
+             for bucket_id in [s3_clean_config.publish_bucket_id, s3_clean_config.embargo_bucket_id]]
 
     # Delete all files in the Public Assets Bucket
-    cleanup_public_assets_bucket(log,
-                                 s3_client,
-                                 s3_paginator,
-                                 s3_clean_config.asset_bucket_id,
-                                 s3_clean_config.assets_prefix,
-                                 s3_clean_config.dataset_id,
-                                 None)
+    calls.append((cleanup_public_assets_bucket, (log,
+                                                 s3_client,
+                                                 s3_paginator,
+                                                 s3_clean_config.asset_bucket_id,
+                                                 s3_clean_config.assets_prefix,
+                                                 s3_clean_config.dataset_id,
+                                                 None)))
+
+    run_calls_in_parallel(calls)
 
 def purge_v5_failure(log, s3_client, s3_paginator, s3_clean_config):
     log.info(f"purge_v5_failure() undo publishing actions and clean public assets bucket")
 
-    for bucket_id in [s3_clean_config.publish_bucket_id, s3_clean_config.embargo_bucket_id]:
-        log.info(f"purge_v5_failure() undo publishing in bucket_id: {bucket_id}")
-        delete_dataset_assets(log, s3_client, bucket_id, s3_clean_config.dataset_id)
-        delete_graph_assets(log, s3_client, bucket_id, s3_clean_config.dataset_id)
-        undo_actions(log, s3_client, bucket_id, s3_clean_config.dataset_id)
-        if s3_clean_config.tidy_enabled:
-            tidy_publication_directory(log, s3_client, bucket_id, s3_clean_config.s3_key_prefix)
+    run_in_parallel(undo_publishing,
+                    [(log, s3_client, bucket_id, s3_clean_config)
+                     for bucket_id in [s3_clean_config.publish_bucket_id, s3_clean_config.embargo_bucket_id]])
 
     # Clean up the Public Assets Bucket
     cleanup_public_assets_bucket(log,
@@ -370,6 +552,23 @@ def purge_v5_failure(log, s3_client, s3_paginator, s3_clean_config):
                                  s3_clean_config.dataset_id,
                                  s3_clean_config.dataset_version)
 
+def undo_publishing(log, s3_client, bucket_id, s3_clean_config):
+    log.info(f"undo_publishing() undo publishing in bucket_id: {bucket_id}")
+    dataset_id = s3_clean_config.dataset_id
+
+    # all the manifests are fetched before any of them is acted upon
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        dataset_assets = executor.submit(load_json_file_from_s3, log, s3_client, bucket_id, s3_key_path(dataset_id, DatasetAssetsKey))
+        graph_assets = executor.submit(load_json_file_from_s3, log, s3_client, bucket_id, s3_key_path(dataset_id, GraphAssetsKey))
+        file_actions = executor.submit(load_dataset_file_actions, log, s3_client, bucket_id, dataset_id)
+
+    # the undo steps touch overlapping keys, so they still run in order
+    delete_dataset_assets(log, s3_client, bucket_id, dataset_id, dataset_assets.result())
+    delete_graph_assets(log, s3_client, bucket_id, dataset_id, graph_assets.result())
+    undo_actions(log, s3_client, bucket_id, dataset_id, file_actions.result())
+    if s3_clean_config.tidy_enabled:
+        tidy_publication_directory(log, s3_client, bucket_id, s3_clean_config.s3_key_prefix)
+
 def cleanup_dataset_revisions(log, s3_client, s3_clean_config):
     log.info(f"cleanup_dataset_revisions() {s3_clean_config.dataset_id}")
     cleanup_dataset_folders(log,
@@ -400,56 +599,69 @@ def cleanup_dataset_folders(log, s3_client, bucket_list, dataset_id, folder_pref
 
 def cleanup_buckets(log, s3_client, bucket_list, key_prefix, cleanup_file):
     log.info(f"cleanup_buckets() key_prefix: {key_prefix} cleanup_file: {cleanup_file} bucket_list: {bucket_list}")
+    run_in_parallel(cleanup_bucket,
+                    [(log, s3_client, bucket_id, key_prefix, cleanup_file) for bucket_id in bucket_list])
 
-    for bucket_id in bucket_list:
-        log.info(f"cleanup_buckets() processing bucket_id: {bucket_id}")
-        file_actions = remove_files_from_bucket(log, s3_client, bucket_id, key_prefix)
-        if file_actions is not None and len(file_actions.get(FileActionListTag, [])) > 0:
-            log.info(f"cleanup_buckets() bucket_id: {bucket_id} cleaned up {len(file_actions.get(FileActionListTag))} files")
-            write_json_file_to_s3(log, s3_client, bucket_id, cleanup_file, json.dumps(file_actions))
+def cleanup_bucket(log, s3_client, bucket_id, key_prefix, cleanup_file):
+    log.info(f"cleanup_bucket() processing bucket_id: {bucket_id}")
+    file_actions = remove_files_from_bucket(log, s3_client, bucket_id, key_prefix)
+    if file_actions is not None and len(file_actions.get(FileActionListTag, [])) > 0:
+        log.info(f"cleanup_bucket() bucket_id: {bucket_id} cleaned up {len(file_actions.get(FileActionListTag))} files")
+        write_json_file_to_s3(log, s3_client, bucket_id, cleanup_file, json_dumps(file_actions))
 
 def remove_files_from_bucket(log, s3_client, bucket_id, key_prefix):
     log.info(f"remove_files_from_bucket() bucket_id: {bucket_id} key_prefix: {key_prefix}")
 
-    file_list = get_list_of_files(log, s3_client, bucket_id, key_prefix)
-    log.info(f"remove_files_from_bucket() will delete {len(file_list)} files")
-    file_action_list = [remove_file(log, s3_client, bucket_id, file) for file in file_list]
+    file_action_list = []
+    batch = []
+    in_flight = set()
+
+    # files are deleted in batches as they are listed; deleting without a VersionId leaves a delete marker,
+    # so each file stays recoverable from its FileActionItem
+    for file in get_list_of_files(log, s3_client, bucket_id, key_prefix):
+        file_action = remove_file_action(log, bucket_id, file)
+        file_action_list.append(file_action)
+        batch.append({'Key': file_action[FileActionPathTag]})
+        if len(batch) >= DeleteObjectsMaxKeys:
+            delete_object_versions(s3_client, bucket_id, batch, in_flight)
+            batch = []
+
+    delete_object_versions(s3_client, bucket_id, batch, in_flight)
+    drain(in_flight)
+    log.info(f"remove_files_from_bucket() deleted {len(file_action_list)} files")
     return {FileActionListTag: file_action_list}
 
 def cleanup_public_assets_bucket(log, s3_client, s3_paginator, bucket_id, prefix, dataset_id, version_id = None):
     log.info(f"cleanup_public_assets_bucket() bucket_id: {bucket_id} prefix: {prefix} dataset_id: {dataset_id} version_id: {version_id}")
     dataset_assets_prefix = public_assets_prefix(prefix, dataset_id, version_id)
-    delete(s3_client, s3_paginator, bucket_id, dataset_assets_prefix)
+    parallel_delete(s3_client, s3_paginator, bucket_id, dataset_assets_prefix)
 
 def get_list_of_files(log, s3_client, bucket_id, prefix):
     '''
-    Gets a list of current files in the S3 Bucket with the specified prefix. Uses a Paginator.
+    Gets the current files in the S3 Bucket with the specified prefix. Uses a Paginator, and yields the files page by page as they are listed.
     :param log: a logger
     :param s3_client: an S3 Client
     :param bucket_id: the name of the S3 Bucket
     :param prefix: the S3 object prefix
-    :return: a list of current files (IsLatest == true), in AWS Response format (ETag, Key, Size, VersionId, IsLatest, etc.)
+    :return: a generator of current files (IsLatest == true), in AWS Response format (ETag, Key, Size, VersionId, IsLatest, etc.)
     '''
     log.info(f"get_list_of_files() bucket_id: {bucket_id} prefix: {prefix}")
     paginator = s3_client.get_paginator('list_object_versions')
-    bucket_listing = [file
-                      for page in paginator.paginate(Bucket=bucket_id, Prefix=prefix, PaginationConfig={'PageSize': 1000})
-                      for file in page.get("Versions", []) if file.get("IsLatest")]
-    return bucket_listing
+    return (file
+            for page in paginator.paginate(Bucket=bucket_id, Prefix=prefix, PaginationConfig={'PageSize': 1000})
+            for file in page.get("Versions", ()) if file.get("IsLatest"))
 
-def remove_file(log, s3_client, bucket_id, file):
+def remove_file_action(log, bucket_id, file):
     '''
-    Deletes a current file from S3. Specifically used for cleaning up folders, a recovery action is returned. This is not a general-purpose delete function.
+    Builds the recovery action for a current file that is about to be deleted. Specifically used for cleaning up folders, the deletes themselves are batched by the caller. This is not a general-purpose delete function.
     :param log: a logger
-    :param s3_client: an S3 Client
     :param bucket_id: the name of the S3 Bucket
     :param file: the S3 object to be deleted (must have a Key and VersionId)
     :return: a FileActionItem (action, bucket, path, versionId)
     '''
     key = file.get("Key")
     version = file.get("VersionId")
-    log.info(f"remove_file() bucket_id: {bucket_id} key: {key} version: {version}")
-    delete_object(log, s3_client, bucket_id, key)
+    log.debug("remove_file_action()", bucket_id=bucket_id, key=key, version=version)
     return {
         "action": FileActionDelete,
         "bucket": bucket_id,
@@ -463,11 +675,13 @@ def delete_all_versions(log, s3_client, bucket_id, dataset_id):
     prefix = f"{dataset_id}/"
     paginator = s3_client.get_paginator('list_object_versions')
     pages = paginator.paginate(Bucket=bucket_id, Prefix=prefix, PaginationConfig={'PageSize': 1000})
+    file_batch = []
     folder_list = []
+    in_flight = set()
 
-    # delete all the files
+    # delete all the files, in the background while the next page is listed
     for page in pages:
-        for o in page.get("DeleteMarkers", []) + page.get("Versions", []):
+        for o in chain(page.get("DeleteMarkers", ()), page.get("Versions", ())):
             key = o.get("Key","")
             folder = key[-1] == '/'
             if folder:
@@ -475,101 +689,116 @@ def delete_all_versions(log, s3_client, bucket_id, dataset_id):
                 folder_list.append(o)
             else:
                 # delete this object version
-                version = o.get("VersionId")
-                delete_object_version(s3_client, bucket_id, key, version)
+                file_batch.append({'Key': key, 'VersionId': o.get("VersionId")})
+                if len(file_batch) >= DeleteObjectsMaxKeys:
+                    delete_object_versions(s3_client, bucket_id, file_batch, in_flight)
+                    file_batch = []
+
+    delete_object_versions(s3_client, bucket_id, file_batch, in_flight)
+    drain(in_flight)
 
-    # delete the folders, in reverse order
+    # delete the folders, in reverse order, once all the files are gone
     folder_list.reverse()
-    for o in folder_list:
-        key = o.get("Key")
-        version = o.get("VersionId")
-        delete_object_version(s3_client, bucket_id, key, version)
+    delete_object_versions(s3_client, bucket_id, [{'Key': o.get("Key"), 'VersionId': o.get("VersionId")} for o in folder_list])
 
-def delete_dataset_assets(log, s3_client, s3_bucket, dataset_id):
+def delete_dataset_assets(log, s3_client, s3_bucket, dataset_id, dataset_assets):
     '''
     This function will remove versions of the dataset assets (banner, readme, manifest.json) that were copied to S3 as part of the publishing process.
     :param log: logger
     :param s3_client: an S3 client
     :param s3_bucket: the name of the S3 Bucket
     :param dataset_id: the published dataset id
+    :param dataset_assets: the dataset assets file (publish.json) in dict() format, or None if there is none
     :return: (none)
     '''
     log.info(f"delete_dataset_assets() s3_bucket: {s3_bucket} dataset_id: {dataset_id}")
-    s3_asset_key = s3_key_path(dataset_id, DatasetAssetsKey)
-    dataset_assets = load_json_file_from_s3(log, s3_client, s3_bucket, s3_asset_key)
     if dataset_assets is not None:
+        objects = []
         for tag in ["bannerManifest", "readmeManifest", "changelogManifest"]:
             log.info(f"delete_dataset_assets() looking for tag: {tag}")
             manifest = dataset_assets.get(tag)
             if manifest is not None:
                 log.info(f"delete_dataset_assets() found manifest: {manifest}")
-                s3_path = manifest.get("path")
-                s3_key = s3_key_path(dataset_id, s3_path)
-                s3_version = manifest.get("s3VersionId")
-                delete_object_version(s3_client, s3_bucket, s3_key, s3_version)
+                objects.append(manifest_object_version(dataset_id, manifest))
+        delete_object_versions(s3_client, s3_bucket, objects)
 
-def delete_graph_assets(log, s3_client, s3_bucket, dataset_id):
+def delete_graph_assets(log, s3_client, s3_bucket, dataset_id, graph_assets):
     '''
     This will delete versions of the graph assets (schemas, models, records) that were copied to the S3 bucket.
     :param log: logger
     :param s3_client: an S3 client
     :param s3_bucket: the name of the S3 bucket
     :param dataset_id: the published dataset id
+    :param graph_assets: the graph assets file (graph.json) in dict() format, or None if there is none
     :return: (none)
     '''
     log.info(f"delete_graph_assets() s3_bucket: {s3_bucket} dataset_id: {dataset_id}")
-    s3_asset_key = s3_key_path(dataset_id, GraphAssetsKey)
-    graph_assets = load_json_file_from_s3(log, s3_client, s3_bucket, s3_asset_key)
     if graph_assets is not None:
         manifests = graph_assets.get("manifests")
         if manifests is not None:
             for manifest in manifests:
                 log.info(f"delete_graph_assets() manifest: {manifest}")
-                s3_path = manifest.get("path")
-                s3_key = s3_key_path(dataset_id, s3_path)
-                s3_version = manifest.get("s3VersionId")
-                delete_object_version(s3_client, s3_bucket, s3_key, s3_version)
+            delete_object_versions(s3_client, s3_bucket, [manifest_object_version(dataset_id, manifest) for manifest in manifests])
+
+def manifest_object_version(dataset_id, manifest):
+    # DeleteObjects rejects a VersionId of None; without one, the current object is deleted
+    object_version = {'Key': s3_key_path(dataset_id, manifest.get("path"))}
+    version_id = manifest.get("s3VersionId")
+    if version_id is not None:
+        object_version['VersionId'] = version_id
+    return object_version
 
-def undo_actions(log, s3_client, bucket_id, dataset_id):
+def undo_actions(log, s3_client, bucket_id, dataset_id, file_actions):
     '''
     This will undo the actions performed during the dataset publishing process. It will remove new files copied, and restore files that were deleted or replaced.
     :param log: logger
     :param s3_client: an S3 client
     :param bucket_id: the name of the publishing S3 bucket
     :param dataset_id: the published dataset id
+    :param file_actions: the File Actions to undo (see load_dataset_file_actions)
     :return: (none)
     '''
     log.info(f"undo_actions() bucket_id: {bucket_id} dataset_id: {dataset_id}")
-
-    file_actions = load_dataset_file_actions(log, s3_client, bucket_id, dataset_id)
     log.info(f"undo_actions() there are {len(file_actions)} file actions to undo")
 
+    # the same key can appear in several file action lists, so each key's versions are listed once and kept up to date as they are deleted
+    version_cache = {}
+    # an action repeated verbatim (same action, bucket, path and version) has nothing left to undo the second time
+    undone = set()
+
     for file_action in file_actions:
         if valid_file_action(file_action):
-            log.info(f"undo_actions() process file_action: {file_action}")
+            undo_key = file_action_key(file_action)
+            if undo_key in undone:
+                log.info("undo_actions() skip duplicate", file_action=file_action)
+                continue
+            undone.add(undo_key)
+            log.info("undo_actions() process", file_action=file_action)
             action = file_action.get(FileActionTag, FileActionUnknown)
-            if action == FileActionCopy:
-                undo_copy(log, s3_client, file_action)
-            elif action == FileActionKeep:
-                undo_keep(log, s3_client, file_action)
-            elif action == FileActionDelete:
-                undo_delete(log, s3_client, file_action)
+            undo = FileActionUndo.get(action)
+            if undo is not None:
+                undo(log, s3_client, file_action, version_cache)
             else:
                 log.info(f"undo_actions() unsupported action: {action}")
         else:
             log.info(f"undo_actions() invalid file_action: {file_action}")
 
 def valid_file_action(file_action):
-    return all([field in file_action for field in FileActionRequiredFields])
+    return FileActionRequiredFields <= file_action.keys()
+
+def file_action_key(file_action):
+    return (file_action.get(FileActionTag),
+            file_action.get(FileActionBucketTag),
+            file_action.get(FileActionPathTag),
+            file_action.get(FileActionVersionTag))
 
 def tidy_publication_directory(log, s3_client, s3_bucket_id, s3_key_prefix):
     log.info(f"tidy_publication_directory() s3_bucket_id: {s3_bucket_id} s3_key_prefix: {s3_key_prefix}")
-    for file_name in PublishingIntermediateFiles:
-        s3_key = s3_key_path(s3_key_prefix, file_name)
-        delete_all_object_versions(log, s3_client, s3_bucket_id, s3_key)
+    run_in_parallel(delete_all_object_versions,
+                    [(log, s3_client, s3_bucket_id, s3_key_path(s3_key_prefix, file_name)) for file_name in PublishingIntermediateFiles])
 
-def undo_copy(log, s3_client, file_action):
-    log.info(f"undo_copy() file_action: {file_action}")
+def undo_copy(log, s3_client, file_action, version_cache=None):
+    log.info("undo_copy()", file_action=file_action)
     s3_bucket = file_action.get(FileActionBucketTag)
     s3_key = file_action.get(FileActionPathTag)
     s3_version = file_action.get(FileActionVersionTag)
@@ -579,67 +808,113 @@ def undo_copy(log, s3_client, file_action):
         # no S3 version on the FileAction indicates that this is the first time a file was to be
         # published to that path, so we need to remove any versions of the file
         delete_all_object_versions(log, s3_client, s3_bucket, s3_key)
+        if version_cache is not None:
+            version_cache.pop((s3_bucket, s3_key), None)
     else:
-        restore_version(log, s3_client, s3_bucket, s3_key, s3_version)
+        restore_version(log, s3_client, s3_bucket, s3_key, s3_version, version_cache)
 
-def undo_keep(log, s3_client, file_action):
-    log.info(f"undo_keep() file_action: {file_action}")
+def undo_keep(log, s3_client, file_action, version_cache=None):
+    log.info("undo_keep()", file_action=file_action)
     s3_bucket = file_action.get(FileActionBucketTag)
     s3_key = file_action.get(FileActionPathTag)
     s3_version = file_action.get(FileActionVersionTag)
-    restore_version(log, s3_client, s3_bucket, s3_key, s3_version)
+    restore_version(log, s3_client, s3_bucket, s3_key, s3_version, version_cache)
 
-def undo_delete(log, s3_client, file_action):
-    log.info(f"undo_delete() file_action: {file_action}")
+def undo_delete(log, s3_client, file_action, version_cache=None):
+    log.info("undo_delete()", file_action=file_action)
     s3_bucket = file_action.get(FileActionBucketTag)
     s3_key = file_action.get(FileActionPathTag)
     s3_version = file_action.get(FileActionVersionTag)
-    restore_version(log, s3_client, s3_bucket, s3_key, s3_version)
+    restore_version(log, s3_client, s3_bucket, s3_key, s3_version, version_cache)
 
-def restore_version(log, s3_client, s3_bucket, s3_key, s3_version):
-    log.info(f"restore_version() bucket: {s3_bucket} key: {s3_key} version: {s3_version}")
+# the undo function for each supported FileAction
+FileActionUndo = {
+    FileActionCopy: undo_copy,
+    FileActionKeep: undo_keep,
+    FileActionDelete: undo_delete,
+}
+
+def restore_version(log, s3_client, s3_bucket, s3_key, s3_version, version_cache=None):
+    log.info("restore_version()", bucket=s3_bucket, key=s3_key, version=s3_version)
     if s3_version is not None:
-        execute = True
-        while execute:
-            versions = get_object_versions(s3_client, s3_bucket, s3_key)
+        cache_key = (s3_bucket, s3_key)
+        versions = version_cache.pop(cache_key, None) if version_cache is not None else None
+        if versions is None and is_latest_version(s3_client, s3_bucket, s3_key, s3_version):
+            log.info("restore_version() is already the latest", key=s3_key, version=s3_version)
+            return
+        removed = set()
+        while True:
+            if versions is None:
+                versions = get_object_versions(s3_client, s3_bucket, s3_key)
             latest = find_latest_version(versions)
-            latest_version = latest.get(S3VersionIdTag, NoValue)
-            if latest_version == s3_version:
-                # the latest version is the desired version, so we are done
-                log.info(f"restore_version() version {latest_version} is the latest")
-                execute = False
-            else:
-                # the latest version is not the desired version, so remove it and check again
-                log.info(f"restore_version() removing version: {latest_version}")
-                delete_object_version(s3_client, s3_bucket, s3_key, latest_version)
+            target = find_version(versions, s3_version)
+            if target is None:
+                log.info(f"restore_version() version {s3_version} not found (bucket: {s3_bucket} key: {s3_key})")
+                break
+            if latest is target:
+                log.info("restore_version() is the latest", key=s3_key, version=s3_version)
+                break
+            # LastModified only has second resolution, so it is only trusted when it is strictly later than the target's;
+            # S3's IsLatest decides between versions stored in the same second, one pass at a time
+            newer_versions = [version for version in versions if version[S3LastModifiedTag] > target[S3LastModifiedTag]]
+            if latest is not None and latest not in newer_versions:
+                newer_versions.append(latest)
+            newer_ids = [version.get(S3VersionIdTag) for version in newer_versions]
+            if removed.issuperset(newer_ids):
+                # nothing new to remove (an earlier delete failed), so another pass would loop forever
+                raise RuntimeError(f"restore_version() could not make version {s3_version} the latest (bucket: {s3_bucket} key: {s3_key})")
+            log.info(f"restore_version() removing versions: {newer_ids}")
+            delete_object_versions(s3_client, s3_bucket, [{'Key': s3_key, 'VersionId': version_id} for version_id in newer_ids])
+            removed.update(newer_ids)
+            versions = [version for version in versions if version.get(S3VersionIdTag) not in removed]
+            if is_latest_version(s3_client, s3_bucket, s3_key, s3_version):
+                log.info("restore_version() is the latest", key=s3_key, version=s3_version)
+                versions = [dict(version, IsLatest=version is target) for version in versions]
+                break
+            # a version stored in the same second as the target is still ahead of it, so the versions are listed again
+            versions = None
+        if version_cache is not None:
+            version_cache[cache_key] = versions
     else:
         log.info(f"restore_version() cannot restore without a valid object version (bucket: {s3_bucket} key: {s3_key} version: {s3_version})")
 
+def is_latest_version(s3_client, s3_bucket, s3_key, s3_version):
+    '''
+    Checks whether a version is the current version of an S3 object with a single HEAD request, so that restoring an untouched file needs no listing.
+    :param s3_client: an S3 client
+    :param s3_bucket: the name of the S3 bucket
+    :param s3_key: S3 Key of the object
+    :param s3_version: the S3 object version
+    :return: True if the version is the current version, False otherwise (including when the current version is a delete marker)
+    '''
+    try:
+        return s3_client.head_object(Bucket=s3_bucket, Key=s3_key).get(S3VersionIdTag) == s3_version
+    except ClientError:
+        return False
+
 def get_object_versions(s3_client, s3_bucket, s3_key):
-    response = s3_client.list_object_versions(Bucket=s3_bucket, Prefix=s3_key)
-    versions = extract_versions(response)
-    return versions
-
-def extract_versions(response):
-    # extract Delete Markers and Versions from the response
-    versions = (response.get(S3DeleteMarkersTag,[]) + response.get(S3VersionsTag,[]))
-    # sort the Versions by timestamp (most recent to oldest)
-    versions.sort(key = lambda x:x[S3LastModifiedTag])
-    versions.reverse()
-    return versions
+    '''
+    Gets every version and delete marker of an S3 object, paging through the whole version history.
+    :param s3_client: an S3 client
+    :param s3_bucket: the name of the S3 bucket
+    :param s3_key: S3 Key of the object
+    :return: the versions of exactly that key, delete markers first, each in S3's listing order (most recent first)
+    '''
+    paginator = s3_client.get_paginator('list_object_versions')
+    pages = paginator.paginate(Bucket=s3_bucket, Prefix=s3_key, PaginationConfig={'PageSize': 1000})
+    return [version for version in extract_versions(pages) if version.get("Key") == s3_key]
+
+def extract_versions(pages):
+    # extract Delete Markers and Versions from the response pages; they are not re-sorted, as LastModified ties
+    # between versions stored in the same second would be ordered arbitrarily
+    return list(chain.from_iterable(chain(page.get(S3DeleteMarkersTag, ()), page.get(S3VersionsTag, ())) for page in pages))
 
 def find_latest_version(versions):
-    latest_list = []
-    found = filter(is_latest, versions)
-    for item in found:
-        latest_list.append(item)
-    if len(latest_list) == 1:
-        return latest_list[0]
-    else:
-        return None
+    # S3 flags exactly one version or delete marker of a key as the latest
+    return next((version for version in versions if version.get(S3IsLatestTag, False)), None)
 
-def is_latest(item):
-    return item.get(S3IsLatestTag, False)
+def find_version(versions, s3_version):
+    return next((version for version in versions if version.get(S3VersionIdTag) == s3_version), None)
 
 def write_json_file_to_s3(log, s3_client, bucket, key, json_data):
     log.info(f"write_json_file_to_s3() bucket: {bucket} key: {bucket}")
@@ -669,7 +944,7 @@ def load_json_file_from_s3(log, s3_client, s3_bucket, s3_key):
         else:
             raise
 
-    json_file = json.loads(s3_object["Body"].read())
+    json_file = json_loads(s3_object["Body"].read())
     return json_file
 
 def load_dataset_file_actions(log, s3_client, bucket_id, dataset_id):
@@ -681,9 +956,11 @@ def load_dataset_file_actions(log, s3_client, bucket_id, dataset_id):
     :param dataset_id: the published dataset id
     :return: combined List of File Actions
     '''
-    return load_file_actions(log, s3_client, bucket_id, dataset_id, FileActionKey) + \
-           load_file_actions(log, s3_client, bucket_id, dataset_id, RevisionsCleanupKey) + \
-           load_file_actions(log, s3_client, bucket_id, dataset_id, MetadataCleanupKey)
+    file_action_keys = [FileActionKey, RevisionsCleanupKey, MetadataCleanupKey]
+    with ThreadPoolExecutor(max_workers=len(file_action_keys)) as executor:
+        file_actions = executor.map(lambda file_action_key: load_file_actions(log, s3_client, bucket_id, dataset_id, file_action_key),
+                                    file_action_keys)
+        return list(chain.from_iterable(file_actions))
 
 def load_file_actions(log, s3_client, bucket_id, dataset_id, file_action_key):
     '''
@@ -706,21 +983,44 @@ def load_file_actions(log, s3_client, bucket_id, dataset_id, file_action_key):
 
 def delete_all_object_versions(log, s3_client, s3_bucket, s3_key):
     log.info(f"delete_all_object_versions() bucket: {s3_bucket} key: {s3_key}")
-    versions = get_object_versions(s3_client, s3_bucket, s3_key)
-    for version in versions:
-        s3_version = version.get(S3VersionIdTag)
-        if s3_version is not None:
-            if s3_version == "null":
-                delete_object(log, s3_client, s3_bucket, s3_key)
-            else:
-                delete_object_version(s3_client, s3_bucket, s3_key, s3_version)
+    paginator = s3_client.get_paginator('list_object_versions')
+    pages = paginator.paginate(Bucket=s3_bucket, Prefix=s3_key, PaginationConfig={'PageSize': 1000})
+    in_flight = set()
 
-def delete_object(log, s3_client, s3_bucket, s3_key):
-    log.info(f"delete_object() s3_bucket: {s3_bucket} s3_key: {s3_key}")
-    s3_client.delete_object(Bucket=s3_bucket, Key=s3_key)
+    # the versions are deleted page by page as they are listed, no ordering is needed when all of them go
+    for page in pages:
+        # a "null" VersionId is passed through as is: it removes the null version itself, where a Key-only delete would add a delete marker
+        objects = [{'Key': s3_key, 'VersionId': version.get(S3VersionIdTag)}
+                   for version in chain(page.get(S3DeleteMarkersTag, ()), page.get(S3VersionsTag, ()))
+                   if version.get("Key") == s3_key and version.get(S3VersionIdTag) is not None]
+        delete_object_versions(s3_client, s3_bucket, objects, in_flight)
 
-def delete_object_version(s3_client, s3_bucket, s3_key, s3_version):
-    s3_client.delete_object(Bucket=s3_bucket, Key=s3_key, VersionId=s3_version)
+    drain(in_flight)
+
+def delete_object_versions(s3_client, s3_bucket, objects, in_flight=None):
+    '''
+    Deletes object versions with DeleteObjects, in batches of up to 1000 per call run concurrently on the DeleteExecutor.
+    :param s3_client: an S3 client
+    :param s3_bucket: the name of the S3 bucket
+    :param objects: a list of {Key, VersionId} dicts (an entry without a VersionId deletes the current object)
+    :param in_flight: a set of pending futures to add the calls to, the caller drains it; if None, waits for the calls to finish
+    :return: (none), raises RuntimeError (when drained) if any of the objects could not be deleted
+    '''
+    pending = set() if in_flight is None else in_flight
+    for i in range(0, len(objects), DeleteObjectsMaxKeys):
+        submit_bounded(DeleteExecutor, pending, delete_objects_or_raise, s3_client=s3_client,
+                       Bucket=s3_bucket, Delete={'Objects': objects[i:i + DeleteObjectsMaxKeys], 'Quiet': True})
+    if in_flight is None:
+        drain(pending)
+
+def delete_objects_or_raise(s3_client, Bucket, Delete):
+    # DeleteObjects reports each object it could not delete in Errors rather than failing the request,
+    # so the errors are raised here to fail the stage, as a per-object delete_object would have
+    response = s3_client.delete_objects(Bucket=Bucket, Delete=Delete)
+    errors = response.get('Errors')
+    if errors:
+        raise RuntimeError(f"delete_objects() could not delete {len(errors)} objects (bucket: {Bucket} first error: {errors[0]})")
+    return response
 
 def public_assets_prefix(prefix, dataset_id, version_id):
     if version_id is None:
@@ -729,5 +1029,4 @@ def public_assets_prefix(prefix, dataset_id, version_id):
         return f"{prefix}/{dataset_id}/{version_id}"
 
 def s3_key_path(prefix, suffix):
-    separator = "" if prefix.endswith("/") else "/"
-    return f"{prefix}{separator}{suffix}"
+    return prefix.removesuffix("/") + "/" + suffix
@@ -1,14 +1,31 @@
 import boto3
+import functools
+import io
+import json
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectionClosedError, EndpointConnectionError
 import os
 import pytest
+import structlog
 import time
-from main import lambda_handler, S3_URL
+from concurrent.futures import ThreadPoolExecutor
 
-PUBLISH_BUCKET = 'test-discover-publish'
-EMBARGO_BUCKET = 'test-discover-embargo'
-ASSET_BUCKET = 'test-discover-assets'
+# each pytest-xdist worker gets its own buckets, so tests can run in parallel processes against one localstack
+WORKER_SUFFIX = '-' + os.environ['PYTEST_XDIST_WORKER'] if 'PYTEST_XDIST_WORKER' in os.environ else ''
+
+PUBLISH_BUCKET = 'test-discover-publish' + WORKER_SUFFIX
+EMBARGO_BUCKET = 'test-discover-embargo' + WORKER_SUFFIX
+ASSET_BUCKET = 'test-discover-assets' + WORKER_SUFFIX
 DATASET_ASSETS_KEY_PREFIX = 'dataset-assets'
 
+# main reads its environment when it is imported
+os.environ.update({
+    'ASSET_BUCKET': ASSET_BUCKET,
+    'DATASET_ASSETS_KEY_PREFIX': DATASET_ASSETS_KEY_PREFIX
+})
+
+from main import lambda_handler, json_dumps, delete_all_versions, delete_dataset_assets, delete_all_object_versions, load_json_file_from_s3, parallel_delete, remove_files_from_bucket, restore_version, undo_actions, S3Client, S3ClientPaginator, S3_URL
+
 # This key corresponds to assets belonging to a dataset version
 # that has either been unpublished or was not published successfully
 S3_PREFIX_TO_DELETE = '1/10'
@@ -20,45 +37,63 @@ S3_PREFIX_TO_KEEP = '1/100'
 # This is a dummy file
 FILENAME = 'test.txt'
 
-s3_resource = boto3.resource('s3', endpoint_url=S3_URL)
+# one session and connection pool is shared by every fixture and assertion; LocalStack is local, so calls fail fast
+# instead of backing off through the default retries
+session = boto3.session.Session()
+s3_config = Config(max_pool_connections=50,
+                   retries={'mode': 'standard', 'max_attempts': 2},
+                   tcp_keepalive=True,
+                   connect_timeout=2,
+                   read_timeout=10)
+s3_resource = session.resource('s3', endpoint_url=S3_URL, config=s3_config)
+s3_client = s3_resource.meta.client
 
+# the dummy file is read once, and uploaded as an in-memory body
+with open(FILENAME, 'rb') as f:
+    BODY = f.read()
 
-@pytest.fixture(scope='module')
+
+@pytest.fixture(scope='session')
 def setup():
-    os.environ.update({
-        'ASSET_BUCKET': ASSET_BUCKET,
-        'DATASET_ASSETS_KEY_PREFIX': DATASET_ASSETS_KEY_PREFIX
-    })
+    wait_for_localstack()
 
-    time.sleep(5)  # let localstack spin up
+
+@pytest.fixture(scope='module')
+def buckets(setup):
+    # the buckets are created once per module, and emptied before each test that uses them
+    buckets = {bucket_name: setup_bucket(bucket_name) for bucket_name in [PUBLISH_BUCKET, EMBARGO_BUCKET, ASSET_BUCKET]}
+    yield buckets
+    for bucket in buckets.values():
+        empty_bucket(bucket)
 
 
 @pytest.fixture(scope='function')
-def publish_bucket(setup):
-    return setup_bucket(PUBLISH_BUCKET)
+def publish_bucket(buckets):
+    return empty_bucket(buckets[PUBLISH_BUCKET])
 
 
 @pytest.fixture(scope='function')
-def embargo_bucket(setup):
-    return setup_bucket(EMBARGO_BUCKET)
+def embargo_bucket(buckets):
+    return empty_bucket(buckets[EMBARGO_BUCKET])
 
 
 @pytest.fixture(scope='function')
-def asset_bucket(setup):
-    return setup_bucket(ASSET_BUCKET)
+def asset_bucket(buckets):
+    return empty_bucket(buckets[ASSET_BUCKET])
 
 
 def test_empty_dataset(publish_bucket, embargo_bucket, asset_bucket):
-    s3_key_to_keep = '{}/{}'.format(S3_PREFIX_TO_KEEP, FILENAME)
-    asset_key_to_keep = '{}/{}'.format(DATASET_ASSETS_KEY_PREFIX, s3_key_to_keep)
+    s3_key_to_keep = f'{S3_PREFIX_TO_KEEP}/{FILENAME}'
+    asset_key_to_keep = f'{DATASET_ASSETS_KEY_PREFIX}/{s3_key_to_keep}'
 
-    publish_bucket.upload_file(Filename=FILENAME, Key=s3_key_to_keep)
-    embargo_bucket.upload_file(Filename=FILENAME, Key=s3_key_to_keep)
-    asset_bucket.upload_file(Filename=FILENAME, Key=asset_key_to_keep)
+    put_file(publish_bucket, s3_key_to_keep)
+    put_file(embargo_bucket, s3_key_to_keep)
+    put_file(asset_bucket, asset_key_to_keep)
 
-    assert s3_keys(publish_bucket) == [s3_key_to_keep]
-    assert s3_keys(embargo_bucket) == [s3_key_to_keep]
-    assert s3_keys(asset_bucket) == [asset_key_to_keep]
+    publish_keys, embargo_keys, asset_keys = s3_keys_of(publish_bucket, embargo_bucket, asset_bucket)
+    assert publish_keys == [s3_key_to_keep]
+    assert embargo_keys == [s3_key_to_keep]
+    assert asset_keys == [asset_key_to_keep]
 
     # RUN LAMBDA
     lambda_handler({
@@ -68,31 +103,30 @@ def test_empty_dataset(publish_bucket, embargo_bucket, asset_bucket):
     }, {})
 
     # VERIFY RESULTS
-    assert s3_keys(publish_bucket) == [s3_key_to_keep]
-    assert s3_keys(embargo_bucket) == [s3_key_to_keep]
-    assert s3_keys(asset_bucket) == [asset_key_to_keep]
+    publish_keys, embargo_keys, asset_keys = s3_keys_of(publish_bucket, embargo_bucket, asset_bucket)
+    assert publish_keys == [s3_key_to_keep]
+    assert embargo_keys == [s3_key_to_keep]
+    assert asset_keys == [asset_key_to_keep]
 
 
 def test_large_dataset_for_publish_bucket(publish_bucket, embargo_bucket, asset_bucket):
     s3_keys_to_delete = create_keys(S3_PREFIX_TO_DELETE, FILENAME)
-    s3_key_to_keep = '{}/{}'.format(S3_PREFIX_TO_KEEP, FILENAME)
-    asset_key_to_delete = '{}/{}/{}'.format(DATASET_ASSETS_KEY_PREFIX, S3_PREFIX_TO_DELETE, FILENAME)
-    asset_key_to_keep = '{}/{}'.format(DATASET_ASSETS_KEY_PREFIX, s3_key_to_keep)
+    s3_key_to_keep = f'{S3_PREFIX_TO_KEEP}/{FILENAME}'
+    asset_key_to_delete = f'{DATASET_ASSETS_KEY_PREFIX}/{S3_PREFIX_TO_DELETE}/{FILENAME}'
+    asset_key_to_keep = f'{DATASET_ASSETS_KEY_PREFIX}/{s3_key_to_keep}'
 
-    for key in s3_keys_to_delete:
-        publish_bucket.upload_file(Filename=FILENAME, Key=key)
-        embargo_bucket.upload_file(Filename=FILENAME, Key=key)
-    asset_bucket.upload_file(Filename=FILENAME, Key=asset_key_to_delete)
+    put_files(s3_keys_to_delete, publish_bucket, embargo_bucket)
+    put_file(asset_bucket, asset_key_to_delete)
 
-    publish_bucket.upload_file(Filename=FILENAME, Key=s3_key_to_keep)
-    embargo_bucket.upload_file(Filename=FILENAME, Key=s3_key_to_keep)
-    asset_bucket.upload_file(Filename=FILENAME, Key=asset_key_to_keep)
+    put_file(publish_bucket, s3_key_to_keep)
+    put_file(embargo_bucket, s3_key_to_keep)
+    put_file(asset_bucket, asset_key_to_keep)
 
-    expected_keys = s3_keys_to_delete
-    expected_keys.append(s3_key_to_keep)
-    assert sorted(s3_keys(publish_bucket)) == sorted(expected_keys)
-    assert sorted(s3_keys(embargo_bucket)) == sorted(expected_keys)
-    assert s3_keys(asset_bucket) == [asset_key_to_delete, asset_key_to_keep]
+    expected_keys = sorted(s3_keys_to_delete + [s3_key_to_keep])
+    publish_keys, embargo_keys, asset_keys = s3_keys_of(publish_bucket, embargo_bucket, asset_bucket)
+    assert sorted(publish_keys) == expected_keys
+    assert sorted(embargo_keys) == expected_keys
+    assert asset_keys == [asset_key_to_delete, asset_key_to_keep]
 
     # RUN LAMBDA
     lambda_handler({
@@ -102,29 +136,31 @@ def test_large_dataset_for_publish_bucket(publish_bucket, embargo_bucket, asset_
     }, {})
 
     # VERIFY RESULTS
-    assert s3_keys(publish_bucket) == [s3_key_to_keep]
-    assert s3_keys(embargo_bucket) == [s3_key_to_keep]
-    assert s3_keys(asset_bucket) == [asset_key_to_keep]
+    publish_keys, embargo_keys, asset_keys = s3_keys_of(publish_bucket, embargo_bucket, asset_bucket)
+    assert publish_keys == [s3_key_to_keep]
+    assert embargo_keys == [s3_key_to_keep]
+    assert asset_keys == [asset_key_to_keep]
 
 
 def test_handle_input_with_trailing_slash(publish_bucket, embargo_bucket, asset_bucket):
-    s3_key_to_delete = '{}/{}'.format(S3_PREFIX_TO_DELETE, FILENAME)
-    s3_key_to_keep = '{}/{}'.format(S3_PREFIX_TO_KEEP, FILENAME)
-    asset_key_to_delete = '{}/{}/{}'.format(DATASET_ASSETS_KEY_PREFIX, S3_PREFIX_TO_DELETE, FILENAME)
-    asset_key_to_keep = '{}/{}'.format(DATASET_ASSETS_KEY_PREFIX, s3_key_to_keep)
+    s3_key_to_delete = f'{S3_PREFIX_TO_DELETE}/{FILENAME}'
+    s3_key_to_keep = f'{S3_PREFIX_TO_KEEP}/{FILENAME}'
+    asset_key_to_delete = f'{DATASET_ASSETS_KEY_PREFIX}/{S3_PREFIX_TO_DELETE}/{FILENAME}'
+    asset_key_to_keep = f'{DATASET_ASSETS_KEY_PREFIX}/{s3_key_to_keep}'
 
-    publish_bucket.upload_file(Filename=FILENAME, Key=s3_key_to_delete)
-    embargo_bucket.upload_file(Filename=FILENAME, Key=s3_key_to_delete)
-    asset_bucket.upload_file(Filename=FILENAME, Key=asset_key_to_delete)
+    put_file(publish_bucket, s3_key_to_delete)
+    put_file(embargo_bucket, s3_key_to_delete)
+    put_file(asset_bucket, asset_key_to_delete)
 
-    publish_bucket.upload_file(Filename=FILENAME, Key=s3_key_to_keep)
-    embargo_bucket.upload_file(Filename=FILENAME, Key=s3_key_to_keep)
-    asset_bucket.upload_file(Filename=FILENAME, Key=asset_key_to_keep)
+    put_file(publish_bucket, s3_key_to_keep)
+    put_file(embargo_bucket, s3_key_to_keep)
+    put_file(asset_bucket, asset_key_to_keep)
 
     expected_keys = [s3_key_to_delete, s3_key_to_keep]
-    assert s3_keys(publish_bucket) == expected_keys
-    assert s3_keys(embargo_bucket) == expected_keys
-    assert s3_keys(asset_bucket) == [asset_key_to_delete, asset_key_to_keep]
+    publish_keys, embargo_keys, asset_keys = s3_keys_of(publish_bucket, embargo_bucket, asset_bucket)
+    assert publish_keys == expected_keys
+    assert embargo_keys == expected_keys
+    assert asset_keys == [asset_key_to_delete, asset_key_to_keep]
 
     # RUN LAMBDA
     lambda_handler({
@@ -134,9 +170,10 @@ def test_handle_input_with_trailing_slash(publish_bucket, embargo_bucket, asset_
     }, {})
 
     # VERIFY RESULTS
-    assert s3_keys(publish_bucket) == [s3_key_to_keep]
-    assert s3_keys(embargo_bucket) == [s3_key_to_keep]
-    assert s3_keys(asset_bucket) == [asset_key_to_keep]
+    publish_keys, embargo_keys, asset_keys = s3_keys_of(publish_bucket, embargo_bucket, asset_bucket)
+    assert publish_keys == [s3_key_to_keep]
+    assert embargo_keys == [s3_key_to_keep]
+    assert asset_keys == [asset_key_to_keep]
 
 
 def test_include_requestor_pays():
@@ -147,20 +184,265 @@ def test_include_requestor_pays():
     }, {}, s3_client=MockClient(), s3_paginator=MockPaginator())
 
 
+def test_delete_all_versions_batches_deletes():
+    client = MockVersionsClient(create_keys('1', FILENAME) + ['1/folder/'])
+
+    delete_all_versions(structlog.get_logger(), client, PUBLISH_BUCKET, '1')
+
+    assert sorted(len(delete['Objects']) for delete in client.deleted[:-1]) == [200, 1000]
+    assert client.deleted[-1]['Objects'] == [{'Key': '1/folder/', 'VersionId': 'v1'}]
+    assert all(delete['Quiet'] for delete in client.deleted)
+
+
+def test_remove_files_from_bucket_batches_deletes():
+    client = MockVersionsClient(create_keys('1/revisions', FILENAME))
+
+    file_actions = remove_files_from_bucket(structlog.get_logger(), client, PUBLISH_BUCKET, '1/revisions')
+
+    assert len(file_actions['fileActionList']) == 1200
+    assert file_actions['fileActionList'][0]['versionId'] == 'v1'
+    assert sorted(len(delete['Objects']) for delete in client.deleted) == [200, 1000]
+    assert {'Key': '1/revisions/1test.txt'} in client.deleted[0]['Objects'] + client.deleted[1]['Objects']
+
+
+def test_restore_version_removes_newer_versions_in_one_call():
+    client = MockVersionsClient([])
+    client.versions = {
+        'Versions': [{'Key': 'a', 'VersionId': 'v1', 'LastModified': 1},
+                     {'Key': 'a', 'VersionId': 'v3', 'LastModified': 3},
+                     {'Key': 'a.bak', 'VersionId': 'v9', 'LastModified': 9}],
+        'DeleteMarkers': [{'Key': 'a', 'VersionId': 'm4', 'LastModified': 4},
+                          {'Key': 'a', 'VersionId': 'm2', 'LastModified': 2}]
+    }
+
+    restore_version(structlog.get_logger(), client, PUBLISH_BUCKET, 'a', 'v1')
+
+    assert client.deleted == [{'Objects': [{'Key': 'a', 'VersionId': 'm4'},
+                                           {'Key': 'a', 'VersionId': 'm2'},
+                                           {'Key': 'a', 'VersionId': 'v3'}],
+                               'Quiet': True}]
+
+
+def test_restore_version_keeps_older_versions_stored_in_the_same_second():
+    client = MockVersionsClient([])
+    client.versions = {
+        'Versions': [{'Key': 'a', 'VersionId': 'v3', 'LastModified': 5, 'Stored': 5.3},
+                     {'Key': 'a', 'VersionId': 'v2', 'LastModified': 5, 'Stored': 5.2}],
+        'DeleteMarkers': [{'Key': 'a', 'VersionId': 'm1', 'LastModified': 5, 'Stored': 5.1}]
+    }
+
+    restore_version(structlog.get_logger(), client, PUBLISH_BUCKET, 'a', 'v2')
+
+    assert client.deleted == [{'Objects': [{'Key': 'a', 'VersionId': 'v3'}], 'Quiet': True}]
+    assert client.head_object(Key='a') == {'VersionId': 'v2'}
+
+
+def test_restore_version_skips_listing_when_already_latest():
+    client = MockVersionsClient([])
+    client.versions = {
+        'Versions': [{'Key': 'a', 'VersionId': 'v1', 'LastModified': 1},
+                     {'Key': 'a', 'VersionId': 'v3', 'LastModified': 3}],
+        'DeleteMarkers': []
+    }
+
+    restore_version(structlog.get_logger(), client, PUBLISH_BUCKET, 'a', 'v3')
+
+    assert client.listed == 0
+    assert client.deleted == []
+
+
+def test_undo_actions_lists_each_key_once():
+    client = MockVersionsClient([])
+    client.versions = {
+        'Versions': [{'Key': 'a', 'VersionId': 'v1', 'LastModified': 1},
+                     {'Key': 'a', 'VersionId': 'v3', 'LastModified': 3}],
+        'DeleteMarkers': [{'Key': 'a', 'VersionId': 'm4', 'LastModified': 4}]
+    }
+    file_actions = [{'action': 'KeepFile', 'bucket': PUBLISH_BUCKET, 'path': 'a', 'versionId': 'v3'},
+                    {'action': 'DeleteFile', 'bucket': PUBLISH_BUCKET, 'path': 'a', 'versionId': 'v1'}]
+
+    undo_actions(structlog.get_logger(), client, PUBLISH_BUCKET, '1', file_actions)
+
+    assert client.listed == 1
+    assert client.deleted == [{'Objects': [{'Key': 'a', 'VersionId': 'm4'}], 'Quiet': True},
+                              {'Objects': [{'Key': 'a', 'VersionId': 'v3'}], 'Quiet': True}]
+
+
+def test_delete_all_object_versions_removes_only_that_key():
+    client = MockVersionsClient([])
+    client.versions = {
+        'Versions': [{'Key': 'a', 'VersionId': 'null', 'LastModified': 1},
+                     {'Key': 'a', 'VersionId': 'v3', 'LastModified': 3},
+                     {'Key': 'a.bak', 'VersionId': 'v9', 'LastModified': 9}],
+        'DeleteMarkers': [{'Key': 'a', 'VersionId': 'm4', 'LastModified': 4}]
+    }
+
+    delete_all_object_versions(structlog.get_logger(), client, PUBLISH_BUCKET, 'a')
+
+    assert client.deleted == [{'Objects': [{'Key': 'a', 'VersionId': 'm4'},
+                                           {'Key': 'a', 'VersionId': 'null'},
+                                           {'Key': 'a', 'VersionId': 'v3'}],
+                               'Quiet': True}]
+
+
+def test_delete_all_object_versions_fails_on_delete_errors():
+    client = MockVersionsClient([])
+    client.versions = {
+        'Versions': [{'Key': 'a', 'VersionId': 'v3', 'LastModified': 3}],
+        'DeleteMarkers': []
+    }
+    client.errors = [{'Key': 'a', 'VersionId': 'v3', 'Code': 'AccessDenied', 'Message': 'Access Denied'}]
+
+    with pytest.raises(RuntimeError, match='AccessDenied'):
+        delete_all_object_versions(structlog.get_logger(), client, PUBLISH_BUCKET, 'a')
+
+
+def test_delete_dataset_assets_without_a_version_deletes_the_current_object():
+    client = MockVersionsClient([])
+    dataset_assets = {'bannerManifest': {'path': 'banner.jpg', 's3VersionId': 'v2'},
+                      'readmeManifest': {'path': 'readme.md'}}
+
+    delete_dataset_assets(structlog.get_logger(), client, PUBLISH_BUCKET, '1', dataset_assets)
+
+    assert client.deleted == [{'Objects': [{'Key': '1/banner.jpg', 'VersionId': 'v2'},
+                                           {'Key': '1/readme.md'}],
+                               'Quiet': True}]
+
+
+def test_load_json_file_from_s3_reads_the_current_file():
+    client = MockJsonClient(b'{"fileActionList": [1]}')
+    key = '1/file-actions.json'
+
+    first = load_json_file_from_s3(structlog.get_logger(), client, PUBLISH_BUCKET, key)
+    first['fileActionList'].append(2)
+
+    assert load_json_file_from_s3(structlog.get_logger(), client, PUBLISH_BUCKET, key) == {'fileActionList': [1]}
+    assert client.requests == [{'Bucket': PUBLISH_BUCKET, 'Key': key}] * 2
+
+
+def test_undo_actions_skips_repeated_actions():
+    client = MockVersionsClient([])
+    client.versions = {
+        'Versions': [{'Key': 'a', 'VersionId': 'v3', 'LastModified': 3}],
+        'DeleteMarkers': []
+    }
+    file_action = {'action': 'CopyFile', 'bucket': PUBLISH_BUCKET, 'path': 'a'}
+
+    undo_actions(structlog.get_logger(), client, PUBLISH_BUCKET, '1', [file_action, dict(file_action)])
+
+    assert client.listed == 1
+    assert client.deleted == [{'Objects': [{'Key': 'a', 'VersionId': 'v3'}], 'Quiet': True}]
+
+
+def test_json_dumps_accepts_non_str_keys():
+    assert json.loads(json_dumps({1: 2})) == {'1': 2}
+
+
+def test_parallel_delete_fans_out_over_sub_folders():
+    client = MockFanoutClient({
+        '1/10/': ['1/10/publish.json'],
+        '1/10/files/': [f'1/10/files/{FILENAME}'],
+        '1/10/metadata/': ['1/10/metadata/schema.json']
+    })
+
+    parallel_delete(client, client, PUBLISH_BUCKET, '1/10/', is_requester_pays=True)
+
+    assert sorted(client.deleted_keys) == ['1/10/files/test.txt', '1/10/metadata/schema.json', '1/10/publish.json']
+    assert sorted(client.listed_prefixes) == ['1/10/files/', '1/10/metadata/']
+
+
+def test_parallel_delete_skips_empty_prefix():
+    client = MockFanoutClient({'1/10/': []})
+
+    parallel_delete(client, client, PUBLISH_BUCKET, '1/10/', is_requester_pays=True)
+
+    assert client.listed_prefixes == []
+    assert client.deleted_keys == []
+
+
+def test_parallel_delete_descends_into_single_sub_folder():
+    client = MockFanoutClient({
+        '1/10/': [],
+        '1/10/files/': ['1/10/files/manifest.json'],
+        '1/10/files/a/': [f'1/10/files/a/{FILENAME}'],
+        '1/10/files/b/': [f'1/10/files/b/{FILENAME}']
+    })
+
+    parallel_delete(client, client, PUBLISH_BUCKET, '1/10/', is_requester_pays=True)
+
+    assert sorted(client.deleted_keys) == ['1/10/files/a/test.txt', '1/10/files/b/test.txt', '1/10/files/manifest.json']
+    assert sorted(client.listed_prefixes) == ['1/10/files/a/', '1/10/files/b/']
+
+
+def test_paginators_are_shared_per_operation():
+    versions_paginator = S3Client.get_paginator('list_object_versions')
+
+    assert versions_paginator is not S3ClientPaginator
+    assert S3Client.get_paginator('list_object_versions') is versions_paginator
+    assert S3Client.get_paginator('list_objects_v2') is S3ClientPaginator
+
+
+def wait_for_localstack(timeout=30):
+    # poll until localstack answers S3 requests, rather than sleeping for a fixed time
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            s3_client.list_buckets()
+            return
+        except (EndpointConnectionError, ConnectionClosedError, ClientError):
+            time.sleep(0.1)
+    s3_client.list_buckets()
+
+
 def setup_bucket(bucket_name):
-    s3_resource.create_bucket(Bucket=bucket_name)
-    bucket = s3_resource.Bucket(bucket_name)
-    bucket.objects.all().delete()
+    try:
+        s3_resource.create_bucket(Bucket=bucket_name)
+    except ClientError as ex:
+        if ex.response['Error']['Code'] != 'BucketAlreadyOwnedByYou':
+            raise
+    return s3_resource.Bucket(bucket_name)
+
+
+def empty_bucket(bucket):
+    # every version and delete marker goes, a page at a time, without building an ObjectVersion resource for each
+    paginator = s3_client.get_paginator('list_object_versions')
+    for page in paginator.paginate(Bucket=bucket.name):
+        objects = [{'Key': v['Key'], 'VersionId': v['VersionId']} for v in page.get('Versions', []) + page.get('DeleteMarkers', [])]
+        if objects:
+            s3_client.delete_objects(Bucket=bucket.name, Delete={'Objects': objects, 'Quiet': True})
     return bucket
 
 
+def put_file(bucket, key):
+    return s3_client.put_object(Bucket=bucket.name, Key=key, Body=BODY)
+
+
+def put_files(keys, *buckets):
+    # every bucket's keys are sent from one pool over the shared client
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(lambda pair: put_file(*pair), [(bucket, key) for bucket in buckets for key in keys]))
+
+
 def s3_keys(bucket):
-    return [obj.key for obj in bucket.objects.all()]
+    # the low-level paginator returns plain Key strings, without building an ObjectSummary per object
+    paginator = bucket.meta.client.get_paginator('list_objects_v2')
+    return [obj['Key'] for page in paginator.paginate(Bucket=bucket.name) for obj in page.get('Contents', [])]
+
+
+def s3_keys_of(*buckets):
+    with ThreadPoolExecutor(max_workers=len(buckets)) as executor:
+        return list(executor.map(s3_keys, buckets))
 
 
 def create_keys(prefix, filename):
-    i = range(1, 1201)
-    return list(map(lambda x: '{}/{}{}'.format(prefix, x, filename), i))
+    return [f'{prefix}/{x}{filename}' for x in range(1, 1201)]
+
+
+@functools.lru_cache(maxsize=8)
+def cached_pages(prefix, filename, page_size):
+    # the pages are built once per prefix and page size, and only read by the code under test
+    keys = create_keys(prefix, filename)
+    return tuple(dict(Contents=[{'Key': k} for k in keys[i:i+page_size]]) for i in range(0, len(keys), page_size))
 
 
 def assert_custom_bucket_request_contains_requester_pays(**kwargs):
@@ -171,18 +453,91 @@ def assert_custom_bucket_request_contains_requester_pays(**kwargs):
 
 
 class MockClient:
+    @staticmethod
+    def list_objects_v2(**kwargs):
+        assert_custom_bucket_request_contains_requester_pays(**kwargs)
+        # a non-empty prefix with no sub-folders, so that the keys are deleted through the paginator
+        return {'Contents': [{'Key': f'{kwargs["Prefix"]}/{FILENAME}'}]}
+
     @staticmethod
     def delete_objects(**kwargs):
         assert_custom_bucket_request_contains_requester_pays(**kwargs)
 
 
+class MockJsonClient:
+    def __init__(self, body):
+        self.body = body
+        self.requests = []
+
+    def get_object(self, **kwargs):
+        self.requests.append(kwargs)
+        return {'Body': io.BytesIO(self.body)}
+
+
 class MockPaginator:
     @staticmethod
     def paginate(**kwargs):
         assert_custom_bucket_request_contains_requester_pays(**kwargs)
-        prefix = kwargs['Prefix']
+        yield from cached_pages(kwargs['Prefix'], FILENAME, kwargs['PaginationConfig']['PageSize'])
+
+
+class MockVersionsClient:
+    def __init__(self, keys):
+        self.keys = keys
+        self.versions = {}
+        self.deleted = []
+        self.errors = []
+        self.listed = 0
+
+    def get_paginator(self, operation_name):
+        return self
+
+    def current(self, key):
+        # LastModified is truncated to the second, so a test can give the actual store time of same-second versions
+        versions = [version for version in self.versions.get('Versions', []) + self.versions.get('DeleteMarkers', []) if version['Key'] == key]
+        return max(versions, key=lambda version: version.get('Stored', version['LastModified']), default=None)
+
+    def head_object(self, **kwargs):
+        current = self.current(kwargs['Key'])
+        if current is None or current in self.versions.get('DeleteMarkers', []):
+            raise ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject')
+        return {'VersionId': current['VersionId']}
+
+    def paginate(self, **kwargs):
+        self.listed += 1
         page_size = kwargs['PaginationConfig']['PageSize']
-        keys = create_keys(prefix, FILENAME)
-        for i in range(0, len(keys), page_size):
-            key_maps = [{'Key': k} for k in keys[i:i+page_size]]
-            yield dict(Contents=key_maps)
+        for i in range(0, len(self.keys), page_size):
+            yield dict(Versions=[{'Key': k, 'VersionId': 'v1', 'IsLatest': True} for k in self.keys[i:i+page_size]])
+        if self.versions:
+            yield {tag: [dict(version, IsLatest=version is self.current(version['Key'])) for version in versions]
+                   for tag, versions in self.versions.items()}
+
+    def delete_objects(self, **kwargs):
+        self.deleted.append(kwargs['Delete'])
+        deleted = [(o['Key'], o.get('VersionId')) for o in kwargs['Delete']['Objects']]
+        self.versions = {tag: [version for version in versions if (version['Key'], version['VersionId']) not in deleted]
+                         for tag, versions in self.versions.items()}
+        return {'Errors': self.errors} if self.errors else {}
+
+
+class MockFanoutClient:
+    def __init__(self, folders):
+        self.folders = folders
+        self.listed_prefixes = []
+        self.deleted_keys = []
+
+    def list_objects_v2(self, **kwargs):
+        assert_custom_bucket_request_contains_requester_pays(**kwargs)
+        prefix = kwargs['Prefix']
+        sub_folders = [p for p in self.folders if p != prefix and p.startswith(prefix) and '/' not in p[len(prefix):-1]]
+        return dict(Contents=[{'Key': k} for k in self.folders[prefix]],
+                    CommonPrefixes=[{'Prefix': p} for p in sub_folders])
+
+    def paginate(self, **kwargs):
+        assert_custom_bucket_request_contains_requester_pays(**kwargs)
+        self.listed_prefixes.append(kwargs['Prefix'])
+        yield dict(Contents=[{'Key': k} for k in self.folders[kwargs['Prefix']]])
+
+    def delete_objects(self, **kwargs):
+        assert_custom_bucket_request_contains_requester_pays(**kwargs)
+        self.deleted_keys.extend(o['Key'] for o in kwargs['Delete']['Objects'])